@@ -1 +1,272 @@
+import io
+from datetime import date
 
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from dagster import (
+    AssetCheckResult, AssetCheckSeverity, AssetKey, Output,
+    build_asset_context, build_input_context, build_output_context,
+)
+
+from covid_pipeline import assets
+from covid_pipeline.assets import ArrowIPCIOManager, leer_datos
+
+CSV_OWID = (
+    b"country,code,date,new_cases,people_vaccinated,population,continent\n"
+    b"Ecuador,ECU,2021-01-01,10,100,17823857,South America\n"
+    b"Peru,PER,2021-01-01,20,200,33359416,South America\n"
+    b"Chile,CHL,2021-01-01,30,300,19212362,South America\n"
+)
+
+
+class _Respuesta:
+    def __init__(self, headers, body=b""):
+        self.headers = headers
+        self.ok = True
+        self.raw = io.BytesIO(body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+def test_io_manager_no_carga_formato_obsoleto_al_cambiar_tipo_de_salida(tmp_path):
+    io_manager = ArrowIPCIOManager(base_dir=str(tmp_path))
+    key = AssetKey("metrica")
+    df = pd.DataFrame({"valor": [1.0, 2.0]})
+
+    io_manager.handle_output(build_output_context(asset_key=key), df)
+    io_manager.handle_output(build_output_context(asset_key=key), "ya no es un DataFrame")
+    assert io_manager.load_input(build_input_context(asset_key=key)) == "ya no es un DataFrame"
+    assert not (tmp_path / "metrica.arrow").exists()
+
+    io_manager.handle_output(build_output_context(asset_key=key), df)
+    pd.testing.assert_frame_equal(io_manager.load_input(build_input_context(asset_key=key)), df)
+    assert not (tmp_path / "metrica").exists()
+
+
+def _leer():
+    """Materializa leer_datos directamente y devuelve solo el DataFrame producido."""
+    return next(r.value for r in leer_datos(build_asset_context()) if isinstance(r, Output))
+
+
+@pytest.fixture
+def owid_http(tmp_path, monkeypatch):
+    """Simula OWID: cuenta las descargas GET y permite cambiar el ETag."""
+    monkeypatch.chdir(tmp_path)
+    estado = {"etag": '"v1"', "gets": 0}
+
+    def fake_head(url, **kwargs):
+        return _Respuesta({"ETag": estado["etag"]})
+
+    def fake_get(url, **kwargs):
+        estado["gets"] += 1
+        return _Respuesta({"ETag": estado["etag"]}, CSV_OWID)
+
+    monkeypatch.setattr(assets.requests, "head", fake_head)
+    monkeypatch.setattr(assets.requests, "get", fake_get)
+    return estado
+
+
+def test_io_manager_round_trip_preserva_dtypes(tmp_path):
+    io_manager = ArrowIPCIOManager(base_dir=str(tmp_path))
+    df = pd.DataFrame({
+        "location": pd.Categorical(["Ecuador", "Peru"]),
+        "date": pd.to_datetime(["2021-01-01", "2021-01-02"]),
+        "new_cases": pd.Series([1.0, 2.0], dtype="float32"),
+    })
+    key = AssetKey("datos_procesados")
+    io_manager.handle_output(build_output_context(asset_key=key), df)
+
+    assert (tmp_path / "datos_procesados.arrow").exists()
+    cargado = io_manager.load_input(build_input_context(asset_key=key))
+    pd.testing.assert_frame_equal(cargado, df)
+
+
+def test_io_manager_pickle_para_valores_no_dataframe(tmp_path):
+    io_manager = ArrowIPCIOManager(base_dir=str(tmp_path))
+    key = AssetKey("reporte_excel_covid")
+    io_manager.handle_output(build_output_context(asset_key=key), "reports/reporte_covid.xlsx")
+
+    assert not (tmp_path / "reporte_excel_covid.arrow").exists()
+    assert io_manager.load_input(build_input_context(asset_key=key)) == "reports/reporte_covid.xlsx"
+
+
+def test_leer_datos_usa_cache_si_el_etag_no_cambia(owid_http):
+    primero = _leer()
+    segundo = _leer()
+
+    assert owid_http["gets"] == 1
+    assert set(primero["location"]) == {"Ecuador", "Peru"}
+    pd.testing.assert_frame_equal(primero, segundo)
+
+
+def test_leer_datos_descarga_si_el_etag_cambia(owid_http):
+    _leer()
+    owid_http["etag"] = '"v2"'
+    _leer()
+
+    assert owid_http["gets"] == 2
+
+
+def test_leer_datos_descarga_si_cambia_el_lector(owid_http, monkeypatch):
+    _leer()
+    monkeypatch.setattr(assets, "USE_ARROW", True)
+    _leer()
+
+    assert owid_http["gets"] == 2
+
+
+def test_leer_datos_descarga_si_head_falla(owid_http, monkeypatch):
+    def head_falla(url, **kwargs):
+        raise requests.ConnectTimeout("sin respuesta")
+
+    monkeypatch.setattr(assets.requests, "head", head_falla)
+    df = _leer()
+
+    assert owid_http["gets"] == 1
+    assert len(df) == 2
+
+
+def test_leer_datos_ordena_categorias_por_nombre_con_pyarrow(owid_http, monkeypatch):
+    # Peru aparece antes que Ecuador: pyarrow crearía las categorías en ese orden
+    csv_peru_primero = CSV_OWID.replace(b"Ecuador,ECU", b"TMP").replace(b"Peru,PER", b"Ecuador,ECU") \
+        .replace(b"TMP", b"Peru,PER")
+    monkeypatch.setattr(assets.requests, "get",
+                        lambda url, **kwargs: _Respuesta({"ETag": '"v1"'}, csv_peru_primero))
+    monkeypatch.setattr(assets, "USE_ARROW", True)
+    df = _leer()
+
+    assert list(df["location"]) == ["Peru", "Ecuador"]
+    assert list(df["location"].cat.categories) == ["Ecuador", "Peru"]
+    assert list(df["iso_code"].cat.categories) == ["ECU", "PER"]
+
+
+def test_leer_datos_fallo_al_escribir_cache_no_deja_clave_valida(owid_http, monkeypatch, tmp_path):
+    _leer()
+    owid_http["etag"] = '"v2"'
+
+    def to_feather_falla(self, path, *args, **kwargs):
+        raise OSError("disco lleno")
+
+    with monkeypatch.context() as m:
+        m.setattr(pd.DataFrame, "to_feather", to_feather_falla)
+        with pytest.raises(OSError):
+            _leer()
+
+    storage = tmp_path / "storage"
+    assert not (storage / "owid_cache.etag").exists()
+    assert sorted(p.name for p in storage.iterdir()) == ["owid_cache.feather"]
+    # La siguiente ejecución vuelve a descargar y reconstruye la caché
+    df = _leer()
+    assert owid_http["gets"] == 3
+    assert len(df) == 2
+    assert (storage / "owid_cache.etag").exists()
+
+
+def _resultados_por_nombre(resultados):
+    return {r.check_name: r for r in resultados}
+
+
+def _metadata(resultado):
+    return {k: v.value for k, v in resultado.metadata.items()}
+
+
+def test_checks_entrada_reporta_los_tres_chequeos():
+    df = pd.DataFrame({
+        "location": pd.Categorical(["Ecuador", "Ecuador", "Peru", "Peru"]),
+        "date": pd.to_datetime(["2021-01-01", "2021-01-01", "2021-01-02", "2099-01-01"]),
+        "new_cases": pd.Series([1.0, 2.0, -3.0, 4.0], dtype="float32"),
+        "population": [17823857.0, 17823857.0, 33359416.0, 33359416.0],
+    })
+    resultados = _resultados_por_nombre(assets._checks_entrada(df, date(2026, 10, 14)))
+
+    assert set(resultados) == {"check_no_fechas_futuras", "check_campos_y_unicidad",
+                               "check_new_cases_no_negativos"}
+    fechas = resultados["check_no_fechas_futuras"]
+    assert not fechas.passed
+    assert fechas.severity == AssetCheckSeverity.ERROR
+    assert _metadata(fechas) == {"filas_afectadas": 1, "hoy": "2026-10-14"}
+    campos = resultados["check_campos_y_unicidad"]
+    assert not campos.passed
+    assert _metadata(campos) == {"null_location": 0, "null_date": 0, "null_population": 0,
+                                 "duplicados_location_date": 1, "population_le_0": 0}
+    negativos = resultados["check_new_cases_no_negativos"]
+    assert negativos.passed
+    assert negativos.severity == AssetCheckSeverity.WARN
+    assert _metadata(negativos)["new_cases_negativos"] == 1
+
+
+def test_checks_entrada_pasan_sobre_datos_limpios():
+    df = pd.DataFrame({
+        "location": pd.Categorical(["Ecuador", "Peru"]),
+        "date": pd.to_datetime(["2021-01-01", "2021-01-01"]),
+        "new_cases": pd.Series([1.0, 2.0], dtype="float32"),
+        "population": [17823857.0, 33359416.0],
+    })
+    resultados = _resultados_por_nombre(assets._checks_entrada(df, date(2026, 10, 14)))
+
+    assert len(resultados) == 3
+    assert all(r.passed for r in resultados.values())
+
+
+def test_leer_datos_evalua_chequeos_antes_del_filtro_de_paises(owid_http, monkeypatch):
+    # Fila sin location y negativo en Chile: se filtran del Output, pero los chequeos los ven
+    csv = CSV_OWID + b",XXX,2021-01-02,5,50,1000,South America\n" \
+                     b"Chile,CHL,2021-01-02,-7,300,19212362,South America\n"
+    monkeypatch.setattr(assets.requests, "get",
+                        lambda url, **kwargs: _Respuesta({"ETag": '"v1"'}, csv))
+    salida = list(leer_datos(build_asset_context()))
+    df = next(r.value for r in salida if isinstance(r, Output))
+    resultados = _resultados_por_nombre(r for r in salida if isinstance(r, AssetCheckResult))
+
+    assert len(df) == 2
+    assert len(resultados) == 3
+    assert _metadata(resultados["check_campos_y_unicidad"])["null_location"] == 1
+    assert not resultados["check_campos_y_unicidad"].passed
+    assert _metadata(resultados["check_new_cases_no_negativos"])["new_cases_negativos"] == 1
+
+
+def _metricas_formulacion_original(df):
+    """Cálculo previo a _compute_all_metrics: transform(lambda) por país."""
+    df = df.copy()
+    df["incidencia_diaria"] = df["new_cases"].astype("float64") / df["population"] * 100000
+    gb = df.groupby("location", observed=True)
+    df["incidencia_7d"] = gb["incidencia_diaria"].transform(
+        lambda s: s.rolling(7, min_periods=7).mean())
+    df["casos_semana"] = gb["new_cases"].transform(lambda s: s.rolling(7, min_periods=7).sum())
+    df["casos_semana_prev"] = gb["new_cases"].transform(lambda s: s.shift(7).rolling(7, min_periods=7).sum())
+    df["factor_crec_7d"] = df["casos_semana"] / df["casos_semana_prev"]
+    inc = df[["date", "location", "incidencia_7d"]].dropna().rename(columns={"date": "fecha", "location": "pais"})
+    fac = df[["date", "location", "casos_semana", "factor_crec_7d"]].dropna().rename(
+        columns={"date": "semana_fin", "location": "pais"})
+    return inc, fac
+
+
+def test_compute_all_metrics_coincide_con_formulacion_original():
+    # Ecuador con 30 días; Peru con solo 10 (< 14: sin factor de crecimiento posible)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "location": pd.Categorical(["Ecuador"] * 30 + ["Peru"] * 10),
+        "date": list(pd.date_range("2021-01-01", periods=30)) + list(pd.date_range("2021-01-01", periods=10)),
+        "new_cases": rng.integers(1, 3000, 40).astype("float32"),
+        "people_vaccinated": np.arange(40, dtype="float64"),
+        "population": [17823857.0] * 30 + [33359416.0] * 10,
+    })
+    inc, fac = assets._compute_all_metrics(df)
+    inc_esperado, fac_esperado = _metricas_formulacion_original(df)
+
+    pd.testing.assert_frame_equal(inc.reset_index(drop=True), inc_esperado.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-6)
+    pd.testing.assert_frame_equal(fac.reset_index(drop=True), fac_esperado.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-6)
+    assert (inc["pais"] == "Peru").sum() == 4
+    assert (fac["pais"] == "Peru").sum() == 0
+    assert len(fac) == 30 - 13
@@ -9,37 +9,34 @@ df = pd.read_csv(csv_path)
 # Perfilado requerido
 perfil = {}
 
-# Columnas y tipos
-column_types = df.dtypes.astype(str).reset_index()
-column_types.columns = ["columna", "tipo"]
+# Columnas y tipos (Series indexada por columna; sin reset_index)
+tipos = df.dtypes.astype(str)
 
-# Mín y máx de new_cases
-min_new_cases = pd.to_numeric(df["new_cases"], errors="coerce").min()
-max_new_cases = pd.to_numeric(df["new_cases"], errors="coerce").max()
+# Mín y máx de new_cases (una sola coerción numérica y un solo agg)
+new_cases = pd.to_numeric(df["new_cases"], errors="coerce")
+min_new_cases, max_new_cases = new_cases.agg(["min", "max"])
 
-# % faltantes en new_cases y people_vaccinated
-pct_missing_new_cases = df["new_cases"].isna().mean() * 100
-pct_missing_people_vaccinated = df["people_vaccinated"].isna().mean() * 100
+# % faltantes en new_cases y people_vaccinated (un solo barrido)
+pct_missing = df[["new_cases", "people_vaccinated"]].isna().mean() * 100
+pct_missing_new_cases = pct_missing["new_cases"]
+pct_missing_people_vaccinated = pct_missing["people_vaccinated"]
 
 # Rango de fechas
 df["date"] = pd.to_datetime(df["date"], errors="coerce")
-min_date = df["date"].min()
-max_date = df["date"].max()
+min_date, max_date = df["date"].agg(["min", "max"])
 
 # Construir tabla de perfilado
-rows = []
 
-# 1) Columnas y tipos (una fila por columna)
-for _, r in column_types.iterrows():
-    rows.append({
-        "seccion": "columnas_tipos",
-        "metro": r["columna"],
-        "valor": r["tipo"],
-        "notas": ""
-    })
+# 1) Columnas y tipos (una fila por columna, sin iterar filas)
+cols_df = pd.DataFrame({
+    "seccion": "columnas_tipos",
+    "metro": tipos.index.to_numpy(),
+    "valor": tipos.to_numpy(copy=False),
+    "notas": ""
+})
 
 # 2) Resumenes
-rows.extend([
+resumen_df = pd.DataFrame([
     {"seccion":"resumen","metro":"min_new_cases","valor":min_new_cases,"notas":""},
     {"seccion":"resumen","metro":"max_new_cases","valor":max_new_cases,"notas":""},
     {"seccion":"resumen","metro":"pct_missing_new_cases","valor":pct_missing_new_cases,"notas":"%"},
@@ -48,6 +45,6 @@ rows.extend([
     {"seccion":"resumen","metro":"max_date","valor":str(max_date.date()) if pd.notnull(max_date) else None,"notas":""},
 ])
 
-perfilado = pd.DataFrame(rows)
+perfilado = pd.concat([cols_df, resumen_df], ignore_index=True)
 perfilado.to_csv("reports/tabla_perfilado.csv", index=False)
 print("Perfilado guardado en reports/tabla_perfilado.csv")
@@ -1,30 +1,125 @@
 from __future__ import annotations
-import io
+import csv
+import json
+import os
+import pickle
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import requests
 from dagster import (
-    asset, asset_check, AssetCheckResult, AssetCheckSeverity,
-    Definitions
+    asset, asset_check, multi_asset, AssetOut, Output, AssetCheckResult, AssetCheckSeverity,
+    AssetCheckSpec, Definitions, ConfigurableIOManager, InputContext, OutputContext
 )
-from dagster import FilesystemIOManager  # reemplaza fs_io_manager
 
 # -----------------------
 # Utilidades
 # -----------------------
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+def _normalize_columns(columns: list[str]) -> list[str]:
     """Normaliza nombres de columnas según el esquema de OWID recibido."""
     ren = {}
-    if "location" not in df.columns and "country" in df.columns:
+    if "location" not in columns and "country" in columns:
         ren["country"] = "location"
-    if "iso_code" not in df.columns and "code" in df.columns:
+    if "iso_code" not in columns and "code" in columns:
         ren["code"] = "iso_code"
-    if ren:
-        df = df.rename(columns=ren)
+    return [ren.get(c, c) for c in columns]
+
+def _read_header(raw) -> list[str]:
+    """Consume y devuelve la línea de encabezado (ya normalizada) de un stream CSV."""
+    return _normalize_columns(next(csv.reader([raw.readline().decode("utf-8-sig")])))
+
+def _read_csv_pandas(raw, header: list[str], usecols: list[str]) -> pd.DataFrame:
+    """Parsea el CSV con el tokenizador C de pandas sobre los bytes crudos."""
+    df = pd.read_csv(raw, engine="c", low_memory=False, header=None, names=header, usecols=usecols,
+                     dtype=READ_DTYPES | dict.fromkeys(CATEGORY_COLUMNS, "category"))
     return df
 
+def _read_csv_arrow(raw, header: list[str], usecols: list[str]) -> pd.DataFrame:
+    """Parsea el CSV con el lector multihilo de pyarrow."""
+    table = pacsv.read_csv(
+        raw,
+        read_options=pacsv.ReadOptions(column_names=header, use_threads=True, block_size=1 << 22),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=usecols,
+            # "date" queda como texto: se convierte con coerce igual que en el lector pandas
+            column_types={c: pa.from_numpy_dtype(t) for c, t in READ_DTYPES.items()}
+                         | {c: pa.dictionary(pa.int32(), pa.string()) for c in CATEGORY_COLUMNS}
+                         | {"date": pa.string()},
+            strings_can_be_null=True,  # "" -> nulo, como en pandas
+        ),
+    )
+    # Diccionarios -> Categorical; strings respaldados por Arrow; numéricos como numpy
+    return table.to_pandas(types_mapper={pa.string(): pd.ArrowDtype(pa.string())}.get)
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Escribe un DataFrame a CSV (to_csv; pyarrow opcional con OWID_ARROW_CSV=1)."""
+    if not USE_ARROW_CSV:
+        df.to_csv(path, index=False)
+        return
+    # Escritor multihilo de pyarrow: mismos valores, pero no los mismos bytes que to_csv
+    # (entrecomilla strings y escribe 924 en vez de 924.0)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Fechas como YYYY-MM-DD, no como timestamp completo
+    schema = pa.schema([pa.field(f.name, pa.date32()) if pa.types.is_timestamp(f.type) else f
+                        for f in table.schema])
+    pacsv.write_csv(table.cast(schema), path,
+                    write_options=pacsv.WriteOptions(batch_size=65536, quoting_style="needed"))
+
+def _http_validator(headers) -> str | None:
+    """Devuelve el validador HTTP de la respuesta (ETag o, si falta, Last-Modified)."""
+    return headers.get("ETag") or headers.get("Last-Modified")
+
+def _replace_atomically(path: Path, write) -> None:
+    """Escribe con write(tmp) en un temporal junto a path y lo mueve encima con os.replace."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def _cache_key(validator: str) -> str:
+    """Clave de la caché: validador HTTP + esquema leído + lector usado."""
+    return json.dumps({
+        "validator": validator,
+        "columns": READ_COLUMNS,
+        "dtypes": READ_DTYPES,
+        "category": CATEGORY_COLUMNS,
+        "arrow": USE_ARROW,
+    }, sort_keys=True)
+
+def _download_owid() -> tuple[pd.DataFrame, str | None]:
+    """Descarga y parsea el CSV de OWID; devuelve el frame y su validador HTTP."""
+    with requests.get(OWID_URL, stream=True, timeout=60) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True  # descomprime gzip/deflate al vuelo
+        # El encabezado se lee aparte: los alias se renombran y proyectan en el propio lector
+        header = _read_header(resp.raw)
+        usecols = [c for c in header if c in READ_COLUMNS]
+        read_csv = _read_csv_arrow if USE_ARROW else _read_csv_pandas
+        df = read_csv(resp.raw, header, usecols)
+        validator = _http_validator(resp.headers)
+    if "date" in df.columns:
+        # Una sola conversión; fechas no parseables -> NaT (las cuenta check_campos_y_unicidad)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df, validator
+
+def _write_excel(sheets: dict[str, pd.DataFrame], path: Path) -> None:
+    """Escribe un libro Excel con una hoja por DataFrame."""
+    # xlsxwriter sin constant_memory: pandas escribe por columnas y ese modo descarta celdas
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for nombre, df in sheets.items():
+            df.to_excel(writer, index=False, sheet_name=nombre)
+
 def _require_cols(df: pd.DataFrame, cols: list[str]) -> list[str]:
     """Devuelve columnas faltantes (no levanta excepción)."""
     return [c for c in cols if c not in df.columns]
@@ -34,82 +129,154 @@ OWID_URL = "https://catalog.ourworldindata.org/garden/covid/latest/compact/compa
 COMPARISON_COUNTRY = "Peru"
 TARGET_COUNTRIES = {"Ecuador", COMPARISON_COUNTRY}
 
-# -----------------------
-# Paso 2: Lectura sin transformar
-# -----------------------
-@asset(group_name="ingesta", description="Lee CSV canónico de OWID sin transformar.")
-def leer_datos(context) -> pd.DataFrame:
-    resp = requests.get(OWID_URL, timeout=60)
-    resp.raise_for_status()
-    df = pd.read_csv(io.StringIO(resp.text))
-    df = _normalize_columns(df)
-    context.log.info(f"Filas leídas: {len(df):,}; columnas: {list(df.columns)[:10]}…")
-    return df
+# Columnas consumidas aguas abajo (proyección en el lector)
+READ_COLUMNS = ["location", "iso_code", "date", "new_cases", "people_vaccinated", "population"]
+READ_DTYPES = {"new_cases": "float32", "people_vaccinated": "float64", "population": "float64"}
+CATEGORY_COLUMNS = ["location", "iso_code"]  # pocos valores, muy repetidos
+USE_ARROW = os.getenv("OWID_ARROW", "0") == "1"  # lector pyarrow opcional
+USE_ARROW_CSV = os.getenv("OWID_ARROW_CSV", "0") == "1"  # escritor CSV pyarrow opcional
+
+# Caché local de la descarga, validada con ETag/Last-Modified
+OWID_CACHE_PATH = Path("storage") / "owid_cache.feather"
+OWID_CACHE_ETAG_PATH = Path("storage") / "owid_cache.etag"
 
 # -------- Chequeos de ENTRADA --------
-@asset_check(asset=leer_datos, description="No hay fechas futuras.")
-def check_no_fechas_futuras(context, leer_datos: pd.DataFrame) -> AssetCheckResult:
-    if "date" not in leer_datos.columns:
-        return AssetCheckResult(
+def _profile_input(df: pd.DataFrame, hoy) -> dict:
+    """Calcula en un solo recorrido las estadísticas de los chequeos de entrada.
+
+    Las entradas cuyas columnas faltan quedan en None.
+    """
+    cols = df.columns
+    claves = [c for c in ("location", "date", "population") if c in cols]
+    nulos = df[claves].isna().sum()
+    return {
+        # Comparación directa sobre el arreglo datetime64 (NaT nunca cuenta como futura)
+        "future_dates": (int(np.count_nonzero(df["date"].to_numpy() > np.datetime64(hoy)))
+                         if "date" in cols else None),
+        "null_location": int(nulos["location"]) if "location" in cols else None,
+        "null_date": int(nulos["date"]) if "date" in cols else None,
+        "null_population": int(nulos["population"]) if "population" in cols else None,
+        "dup_location_date": (int(df.duplicated(subset=["location", "date"]).sum())
+                              if {"location", "date"} <= set(cols) else None),
+        "pop_le_0": int((df["population"] <= 0).sum()) if "population" in cols else None,
+        "new_cases_negativos": int((df["new_cases"] < 0).sum()) if "new_cases" in cols else None,
+    }
+
+# Los chequeos de entrada se evalúan dentro de leer_datos sobre el frame completo
+# (todos los países), antes del filtro a TARGET_COUNTRIES
+INPUT_CHECK_SPECS = [
+    AssetCheckSpec("check_no_fechas_futuras", asset="leer_datos",
+                   description="No hay fechas futuras."),
+    AssetCheckSpec("check_campos_y_unicidad", asset="leer_datos",
+                   description="Claves no nulas; unicidad (location,date); population>0."),
+    AssetCheckSpec("check_new_cases_no_negativos", asset="leer_datos",
+                   description="new_cases no negativos (revisiones OWID)."),
+]
+
+def _checks_entrada(df: pd.DataFrame, now) -> Iterator[AssetCheckResult]:
+    """Genera los tres resultados de INPUT_CHECK_SPECS a partir de un único perfil de df."""
+    perfil = _profile_input(df, now)
+
+    if perfil["future_dates"] is None:
+        yield AssetCheckResult(
+            check_name="check_no_fechas_futuras",
             passed=False,
             severity=AssetCheckSeverity.ERROR,
             metadata={"error": "Falta columna 'date'"}
         )
-    now = datetime.now(timezone.utc).date()
-    fechas = pd.to_datetime(leer_datos["date"], errors="coerce").dt.date
-    filas_afectadas = int((fechas > now).sum())
-    return AssetCheckResult(
-        passed=(filas_afectadas == 0),
-        # si pasa, no seteamos severity; si falla, ERROR
-        severity=AssetCheckSeverity.ERROR if filas_afectadas else None,
-        metadata={"filas_afectadas": filas_afectadas, "hoy": str(now)},
-    )
+    else:
+        filas_afectadas = perfil["future_dates"]
+        yield AssetCheckResult(
+            check_name="check_no_fechas_futuras",
+            passed=(filas_afectadas == 0),
+            # severity solo importa si falla: ERROR
+            severity=AssetCheckSeverity.ERROR,
+            metadata={"filas_afectadas": filas_afectadas, "hoy": str(now)},
+        )
 
-@asset_check(asset=leer_datos, description="Claves no nulas; unicidad (location,date); population>0.")
-def check_campos_y_unicidad(context, leer_datos: pd.DataFrame) -> AssetCheckResult:
-    faltan = _require_cols(leer_datos, ["location", "date", "population"])
+    faltan = _require_cols(df, ["location", "date", "population"])
     if faltan:
-        return AssetCheckResult(
+        yield AssetCheckResult(
+            check_name="check_campos_y_unicidad",
             passed=False,
             severity=AssetCheckSeverity.ERROR,
             metadata={"faltan_columnas": ", ".join(faltan)}
         )
-    base = leer_datos.copy()
-    base["date"] = pd.to_datetime(base["date"], errors="coerce")
-    n_null_loc = int(base["location"].isna().sum())
-    n_null_date = int(base["date"].isna().sum())
-    n_null_pop = int(base["population"].isna().sum())
-    dup = int(base.duplicated(subset=["location", "date"]).sum())
-    pop_le_0 = int((pd.to_numeric(base["population"], errors="coerce") <= 0).sum())
-    passed = (n_null_loc==0 and n_null_date==0 and n_null_pop==0 and dup==0 and pop_le_0==0)
-    return AssetCheckResult(
-        passed=passed,
-        severity=None if passed else AssetCheckSeverity.ERROR,
-        metadata={
-            "null_location": n_null_loc,
-            "null_date": n_null_date,
-            "null_population": n_null_pop,
-            "duplicados_location_date": dup,
-            "population_le_0": pop_le_0,
-        },
-    )
+    else:
+        metadata = {
+            "null_location": perfil["null_location"],
+            "null_date": perfil["null_date"],
+            "null_population": perfil["null_population"],
+            "duplicados_location_date": perfil["dup_location_date"],
+            "population_le_0": perfil["pop_le_0"],
+        }
+        passed = not any(metadata.values())
+        yield AssetCheckResult(
+            check_name="check_campos_y_unicidad",
+            passed=passed,
+            severity=AssetCheckSeverity.ERROR,
+            metadata=metadata,
+        )
 
-@asset_check(asset=leer_datos, description="new_cases no negativos (revisiones OWID).")
-def check_new_cases_no_negativos(context, leer_datos: pd.DataFrame) -> AssetCheckResult:
-    if "new_cases" not in leer_datos.columns:
-        return AssetCheckResult(
+    if perfil["new_cases_negativos"] is None:
+        yield AssetCheckResult(
+            check_name="check_new_cases_no_negativos",
             passed=True,  # no bloquear
             severity=AssetCheckSeverity.WARN,
             metadata={"nota": "Falta columna 'new_cases' para el check"}
         )
-    serie = pd.to_numeric(leer_datos["new_cases"], errors="coerce")
-    n_neg = int((serie < 0).sum())
-    # No bloquear el run: marcar como passed con warning si hay negativos
-    return AssetCheckResult(
-        passed=True,
-        severity=AssetCheckSeverity.WARN,
-        metadata={"new_cases_negativos": n_neg, "nota": "OWID puede tener revisiones negativas puntuales."},
-    )
+    else:
+        # No bloquear el run: marcar como passed con warning si hay negativos
+        yield AssetCheckResult(
+            check_name="check_new_cases_no_negativos",
+            passed=True,
+            severity=AssetCheckSeverity.WARN,
+            metadata={"new_cases_negativos": perfil["new_cases_negativos"],
+                      "nota": "OWID puede tener revisiones negativas puntuales."},
+        )
+
+# -----------------------
+# Paso 2: Lectura sin transformar
+# -----------------------
+@asset(group_name="ingesta", description="Lee CSV canónico de OWID (solo columnas usadas y países objetivo).",
+       check_specs=INPUT_CHECK_SPECS)
+def leer_datos(context) -> Iterator[Output | AssetCheckResult]:
+    try:
+        head = requests.head(OWID_URL, timeout=10, allow_redirects=True)
+        validator = _http_validator(head.headers) if head.ok else None
+    except requests.RequestException as exc:
+        # Sin validador no se confía en la caché, pero la descarga normal aún puede funcionar
+        context.log.warning(f"HEAD a OWID falló ({exc}); se descarga sin caché")
+        validator = None
+    if (validator and OWID_CACHE_PATH.exists() and OWID_CACHE_ETAG_PATH.exists()
+            and OWID_CACHE_ETAG_PATH.read_text() == _cache_key(validator)):
+        df = pd.read_feather(OWID_CACHE_PATH)
+        context.log.info(f"OWID sin cambios ({validator}); usando caché {OWID_CACHE_PATH}")
+    else:
+        df, validator = _download_owid()
+        if validator:
+            # Se cachea el frame completo (antes del filtro) para no depender de TARGET_COUNTRIES
+            # La clave se borra antes y se escribe después del feather: un fallo a mitad
+            # deja la caché invalidada, nunca una clave válida sobre un archivo a medias
+            OWID_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            OWID_CACHE_ETAG_PATH.unlink(missing_ok=True)
+            _replace_atomically(OWID_CACHE_PATH, df.to_feather)
+            clave = _cache_key(validator)
+            _replace_atomically(OWID_CACHE_ETAG_PATH, lambda tmp: Path(tmp).write_text(clave))
+    n_total = len(df)
+    # Chequeos sobre todas las filas leídas: nulos de location u otros países también cuentan
+    resultados = list(_checks_entrada(df, datetime.now(timezone.utc).date()))
+    if "location" in df.columns:
+        # Solo se usan los países objetivo: filtrar aquí abarata procesamiento y almacenamiento
+        df = df[df["location"].isin(TARGET_COUNTRIES)].reset_index(drop=True)
+        for c in df.columns.intersection(CATEGORY_COLUMNS):
+            # Categorías por nombre: pyarrow las crea por orden de aparición, y
+            # datos_procesados ordena por código
+            usadas = df[c].cat.remove_unused_categories()
+            df[c] = usadas.cat.reorder_categories(sorted(usadas.cat.categories))
+    context.log.info(f"Filas leídas: {n_total:,}; filas países objetivo: {len(df):,}; columnas: {list(df.columns)[:10]}…")
+    yield Output(df)
+    yield from resultados
 
 # -----------------------
 # Paso 3: Procesamiento
@@ -119,47 +286,69 @@ def datos_procesados(context, leer_datos: pd.DataFrame) -> pd.DataFrame:
     faltan = _require_cols(leer_datos, ["location", "date", "new_cases", "people_vaccinated", "population"])
     if faltan:
         raise KeyError(f"Faltan columnas requeridas para procesar: {faltan}")
-    df = leer_datos.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df[df["location"].isin(TARGET_COUNTRIES)].copy()
-    df = df[~(df["new_cases"].isna() | df["people_vaccinated"].isna())].copy()
+    mask = (leer_datos["location"].isin(TARGET_COUNTRIES)
+            & leer_datos["new_cases"].notna()
+            & leer_datos["people_vaccinated"].notna())
+    df = leer_datos.loc[mask, ["location", "date", "new_cases", "people_vaccinated", "population"]]
     before = len(df)
-    df = df.drop_duplicates(subset=["location", "date"])
+    df.drop_duplicates(subset=["location", "date"], keep="first", ignore_index=True, inplace=True)
     removed_dups = before - len(df)
-    df = df[["location", "date", "new_cases", "people_vaccinated", "population"]].copy()
+    # Orden único (location, date): las métricas lo reutilizan sin volver a ordenar
+    df = df.sort_values(["location", "date"], kind="mergesort", ignore_index=True)
+    # float32 basta para casos diarios; people_vaccinated/population siguen en float64
+    # (superan 2**24 y float32 no los representa exactos)
+    df["new_cases"] = df["new_cases"].astype("float32")
     context.log.info(f"Filas tras limpieza: {len(df):,}; duplicados removidos: {removed_dups}")
     return df
 
 # -----------------------
 # Paso 4: Métricas
 # -----------------------
-@asset(group_name="metricas", description="Incidencia 7d por 100k.")
-def metrica_incidencia_7d(context, datos_procesados: pd.DataFrame) -> pd.DataFrame:
-    df = datos_procesados.copy().sort_values(["location", "date"])
-    df["incidencia_diaria"] = (pd.to_numeric(df["new_cases"], errors="coerce") /
-                               pd.to_numeric(df["population"], errors="coerce")) * 100000
-    df["incidencia_7d"] = df.groupby("location")["incidencia_diaria"].transform(
-        lambda s: s.rolling(7, min_periods=7).mean()
-    )
-    out = df[["date", "location", "incidencia_7d"]].dropna().rename(columns={"date": "fecha", "location": "pais"})
-    return out
-
-@asset(group_name="metricas", description="Factor de crecimiento 7d: suma 7d / suma previos 7d.")
-def metrica_factor_crec_7d(context, datos_procesados: pd.DataFrame) -> pd.DataFrame:
-    df = datos_procesados.copy().sort_values(["location", "date"])
-    df["new_cases"] = pd.to_numeric(df["new_cases"], errors="coerce")
-    df["casos_semana"] = df.groupby("location")["new_cases"].transform(lambda s: s.rolling(7, min_periods=7).sum())
-    df["casos_semana_prev"] = df.groupby("location")["new_cases"].transform(lambda s: s.shift(7).rolling(7, min_periods=7).sum())
-    df["factor_crec_7d"] = df["casos_semana"] / df["casos_semana_prev"]
-    out = df[["date", "location", "casos_semana", "factor_crec_7d"]].dropna().rename(
-        columns={"date": "semana_fin", "location": "pais"}
-    )
-    return out
+def _compute_all_metrics(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Incidencia 7d y factor de crecimiento 7d con un solo groupby/rolling.
+
+    df debe venir ordenado por (location, date), como lo deja datos_procesados.
+    """
+    diario = pd.DataFrame({
+        "incidencia_diaria": (df["new_cases"].astype("float32") /
+                              df["population"].astype("float32")) * np.float32(100000),
+        "new_cases": df["new_cases"],
+    })
+    # Ambas sumas 7d en una única pasada de ventana por país
+    suma_7d = (diario.groupby(df["location"], sort=False, observed=True)
+               .rolling(7, min_periods=7).sum()
+               .reset_index(level=0, drop=True))
+    casos_semana = suma_7d["new_cases"]
+    # La semana previa es la suma 7d desplazada 7 filas dentro de cada país
+    casos_semana_prev = casos_semana.groupby(df["location"], sort=False, observed=True).shift(7)
+    inc = pd.DataFrame({
+        "fecha": df["date"],
+        "pais": df["location"],
+        "incidencia_7d": suma_7d["incidencia_diaria"] / 7,  # min_periods=7: media = suma / 7
+    }).dropna()
+    fac = pd.DataFrame({
+        "semana_fin": df["date"],
+        "pais": df["location"],
+        "casos_semana": casos_semana,
+        "factor_crec_7d": casos_semana / casos_semana_prev,
+    }).dropna()
+    return inc, fac
+
+@multi_asset(
+    group_name="metricas",
+    outs={
+        "metrica_incidencia_7d": AssetOut(description="Incidencia 7d por 100k."),
+        "metrica_factor_crec_7d": AssetOut(description="Factor de crecimiento 7d: suma 7d / suma previos 7d."),
+    },
+)
+def metricas_7d(context, datos_procesados: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # datos_procesados ya ordenado por (location, date); no se modifica
+    return _compute_all_metrics(datos_procesados)
 
 # -----------------------
 # Paso 5: Chequeo de salida
 # -----------------------
-@asset_check(asset=metrica_incidencia_7d, description="Incidencia 7d en [0,2000] (solo informativo).")
+@asset_check(asset="metrica_incidencia_7d", description="Incidencia 7d en [0,2000] (solo informativo).")
 def check_incidencia_rango(context, metrica_incidencia_7d: pd.DataFrame) -> AssetCheckResult:
     if "incidencia_7d" not in metrica_incidencia_7d.columns:
         return AssetCheckResult(
@@ -167,8 +356,9 @@ def check_incidencia_rango(context, metrica_incidencia_7d: pd.DataFrame) -> Asse
             severity=AssetCheckSeverity.WARN,
             metadata={"nota": "Falta 'incidencia_7d' para el check"}
         )
-    serie = pd.to_numeric(metrica_incidencia_7d["incidencia_7d"], errors="coerce")
-    fuera = int(((serie < 0) | (serie > 2000)).sum())
+    valores = pd.to_numeric(metrica_incidencia_7d["incidencia_7d"], errors="coerce").to_numpy()
+    # Máscara numpy directa: sin Series intermedias ni alineación de índices
+    fuera = int(np.count_nonzero((valores < 0) | (valores > 2000)))
     # No bloquear el run: siempre passed; avisar si hay fuera de rango
     return AssetCheckResult(
         passed=True,
@@ -187,19 +377,59 @@ def reporte_excel_covid(context,
     reports_dir = Path("reports")
     reports_dir.mkdir(parents=True, exist_ok=True)
     excel_path = reports_dir / "reporte_covid.xlsx"
-    with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
-        datos_procesados.to_excel(writer, index=False, sheet_name="datos_procesados")
-        metrica_incidencia_7d.to_excel(writer, index=False, sheet_name="metrica_incidencia_7d")
-        metrica_factor_crec_7d.to_excel(writer, index=False, sheet_name="metrica_factor_crec_7d")
-    datos_procesados.to_csv(reports_dir / "datos_procesados.csv", index=False)
-    metrica_incidencia_7d.to_csv(reports_dir / "metrica_incidencia_7d.csv", index=False)
-    metrica_factor_crec_7d.to_csv(reports_dir / "metrica_factor_crec_7d.csv", index=False)
+    salidas = {
+        "datos_procesados": datos_procesados,
+        "metrica_incidencia_7d": metrica_incidencia_7d,
+        "metrica_factor_crec_7d": metrica_factor_crec_7d,
+    }
+    # El libro Excel no admite escritura concurrente de hojas: va en un solo hilo,
+    # solapado con los CSV (independientes entre sí)
+    with ThreadPoolExecutor(max_workers=len(salidas) + 1) as ex:
+        futuros = [ex.submit(_write_excel, salidas, excel_path)]
+        futuros += [ex.submit(_write_csv, df, reports_dir / f"{nombre}.csv") for nombre, df in salidas.items()]
+        for futuro in futuros:
+            futuro.result()  # propaga cualquier error de escritura
     context.log.info(f"Reporte exportado a {excel_path}")
     return str(excel_path)
 
+# -----------------------
+# IO manager: DataFrames entre assets como Arrow IPC
+# -----------------------
+class ArrowIPCIOManager(ConfigurableIOManager):
+    """Persiste DataFrames como archivos Arrow IPC (otros valores con pickle)."""
+    base_dir: str
+
+    def _path(self, context: InputContext | OutputContext) -> Path:
+        return Path(self.base_dir).joinpath(*context.asset_key.path)
+
+    def handle_output(self, context: OutputContext, obj) -> None:
+        path = self._path(context)
+        arrow_path = path.with_suffix(".arrow")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Se borra el archivo del otro formato: load_input no debe encontrar uno obsoleto
+        if isinstance(obj, pd.DataFrame):
+            path.unlink(missing_ok=True)
+            table = pa.Table.from_pandas(obj, preserve_index=False)
+            with pa.OSFile(str(arrow_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            arrow_path.unlink(missing_ok=True)
+            with open(path, "wb") as f:
+                pickle.dump(obj, f)
+
+    def load_input(self, context: InputContext):
+        path = self._path(context)
+        arrow_path = path.with_suffix(".arrow")
+        if arrow_path.exists():
+            # Lectura por memory-map; los metadatos pandas restauran category/datetime/float32
+            return pa.ipc.open_file(pa.memory_map(str(arrow_path))).read_all().to_pandas()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
 # Definitions con IO manager persistente
 defs = Definitions(
-    assets=[leer_datos, datos_procesados, metrica_incidencia_7d, metrica_factor_crec_7d, reporte_excel_covid],
-    asset_checks=[check_no_fechas_futuras, check_campos_y_unicidad, check_new_cases_no_negativos, check_incidencia_rango],
-    resources={"io_manager": FilesystemIOManager(base_dir="storage")},
+    assets=[leer_datos, datos_procesados, metricas_7d, reporte_excel_covid],
+    asset_checks=[check_incidencia_rango],
+    resources={"io_manager": ArrowIPCIOManager(base_dir="storage")},
 )